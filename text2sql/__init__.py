@@ -2,7 +2,9 @@
 
 __all__ = [
     "app",
+    "cache",
     "data_utils",
+    "evaluate",
     "llm",
     "prompt_template",
 ]
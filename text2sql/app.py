@@ -2,19 +2,35 @@
 from __future__ import annotations
 
 import argparse
-import json
+import asyncio
+import atexit
+import itertools
 import logging
+import logging.handlers
+import os
+import queue
 from pathlib import Path
 from time import perf_counter
 from typing import List
 
+import orjson
 from dotenv import load_dotenv
-from tqdm import tqdm
+from tqdm.asyncio import tqdm
 
-from . import data_utils, llm, prompt_template
+from . import cache, data_utils, llm, prompt_template
+
+try:
+    # Optional libuv-based event loop; cuts per-task scheduling and socket
+    # overhead for the many short-lived HTTPS calls. Not available on Windows.
+    import uvloop
+except ImportError:  # pragma: no cover - platform dependent
+    uvloop = None
 
 LOGGER = logging.getLogger(__name__)
 
+# Flush the crash-recovery partial file once per this many completions.
+_PARTIAL_FLUSH_EVERY = 32
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Spider Text-to-SQL baseline")
@@ -37,6 +53,44 @@ def parse_args() -> argparse.Namespace:
         choices=sorted(llm.ROUTER_CONFIGS.keys()),
         help="LLM router to target (defaults to config default_router or openrouter).",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=16,
+        help="Maximum number of LLM requests kept in flight at once.",
+    )
+    parser.add_argument(
+        "--max-failures",
+        type=int,
+        default=None,
+        help="Abort the run (cancelling pending requests) once more than this "
+        "many examples have failed (default: never).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Number of same-database questions to pack into one LLM request "
+        "(1 disables batching).",
+    )
+    parser.add_argument(
+        "--max-schema-tables",
+        type=int,
+        default=prompt_template.DEFAULT_MAX_SCHEMA_TABLES,
+        help="Keep at most this many question-relevant tables in the prompt schema "
+        "(pass 0 to disable truncation).",
+    )
+    parser.add_argument(
+        "--cache-path",
+        type=Path,
+        default=cache.DEFAULT_CACHE_PATH,
+        help="Path to the SQLite prompt/response cache.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the on-disk prompt/response cache.",
+    )
     parser.add_argument(
         "--num_samples",
         type=int,
@@ -55,9 +109,177 @@ def parse_args() -> argparse.Namespace:
         choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
         help="Logging verbosity.",
     )
+    parser.add_argument(
+        "--log-prompts",
+        action="store_true",
+        help="Log full prompts and predicted SQL at INFO level "
+        "(otherwise they are only visible at DEBUG).",
+    )
     return parser.parse_args()
 
 
+def _batch_by_db(
+    examples: List[data_utils.SpiderExample], batch_size: int
+) -> List[List[tuple[int, data_utils.SpiderExample]]]:
+    """Group examples by ``db_id`` and chunk each group into batches.
+
+    Original dataset indices are carried alongside each example so batched
+    results can be written back in input order.
+    """
+
+    indexed = sorted(enumerate(examples), key=lambda pair: pair[1].db_id)
+    batches: List[List[tuple[int, data_utils.SpiderExample]]] = []
+    for _, group in itertools.groupby(indexed, key=lambda pair: pair[1].db_id):
+        group = list(group)
+        for start in range(0, len(group), batch_size):
+            batches.append(group[start : start + batch_size])
+    return batches
+
+
+async def generate_predictions(
+    client: llm.OpenAIChatLLM,
+    dataset: data_utils.SpiderDataset,
+    examples: List[data_utils.SpiderExample],
+    model_name: str,
+    concurrency: int = 16,
+    partial_path: Path | None = None,
+    max_schema_tables: int | None = prompt_template.DEFAULT_MAX_SCHEMA_TABLES,
+    batch_size: int = 1,
+    max_failures: int | None = None,
+    log_prompts: bool = False,
+) -> List[str]:
+    """Generate SQL for ``examples`` concurrently, preserving input order.
+
+    Every example is an independent network-bound call, so the requests are
+    issued through ``asyncio`` tasks guarded by a semaphore instead of a
+    sequential loop. Results are written back by index so the output lines
+    line up with the dataset order regardless of completion order.
+
+    When ``partial_path`` is given, each prediction is also appended there
+    as ``index\\tsql`` the moment it completes, so a crashed or killed run
+    leaves the finished work on disk instead of losing it with the process.
+
+    With ``batch_size`` > 1, questions that share a database are packed
+    into one request per batch so the schema and instruction tokens are
+    paid once per batch instead of once per question; batches whose
+    response cannot be parsed are retried one question at a time.
+
+    ``max_failures`` caps how many examples may fail before the run is
+    aborted: pending tasks are cancelled and a RuntimeError is raised so a
+    misconfigured run (bad key, dead endpoint) stops immediately instead of
+    burning through the whole dataset.
+    """
+
+    # Prompts and predictions are several KB each; keep them out of the log
+    # stream (and skip the formatting work) unless explicitly requested.
+    prompt_log_level = logging.INFO if log_prompts else logging.DEBUG
+
+    semaphore = asyncio.Semaphore(concurrency)
+    write_lock = asyncio.Lock()
+    pred_rows: List[str] = [""] * len(examples)
+    partial_fh = (
+        partial_path.open("w", encoding="utf-8", buffering=1 << 16)
+        if partial_path is not None
+        else None
+    )
+
+    completed = 0
+    failures = 0
+
+    async def record(index: int, predicted_sql: str) -> None:
+        nonlocal completed
+        # Store SQL (or empty string if the model failed)
+        pred_rows[index] = predicted_sql
+        completed += 1
+        if partial_fh is not None:
+            async with write_lock:
+                partial_fh.write(f"{index}\t{predicted_sql}\n")
+                # Batch flushes; the close() in the finally block covers the tail.
+                if completed % _PARTIAL_FLUSH_EVERY == 0:
+                    partial_fh.flush()
+
+    async def generate_one(index: int, example: data_utils.SpiderExample) -> None:
+        schema = dataset.get_schema(example.db_id)
+        prompt = prompt_template.build_prompt(
+            example.question,
+            schema,
+            db_id=example.db_id,
+            tables=dataset.get_tables(example.db_id),
+            max_tables=max_schema_tables,
+            model=model_name,
+        )
+
+        async with semaphore:
+            try:
+                if LOGGER.isEnabledFor(prompt_log_level):
+                    LOGGER.log(prompt_log_level, "Prompt sent to LLM: %s", prompt)
+                result = await client.agenerate(prompt=prompt, model=model_name)
+                predicted_sql = data_utils.extract_sql_query(result.sql)
+                if LOGGER.isEnabledFor(prompt_log_level):
+                    LOGGER.log(prompt_log_level, "Predicted SQL Query: %s", predicted_sql)
+            except Exception as exc:  # pragma: no cover - network dependent
+                nonlocal failures
+                failures += 1
+                LOGGER.error("Failed to generate SQL for %s: %s", example.db_id, exc)
+                predicted_sql = ""
+
+        await record(index, predicted_sql)
+
+    async def generate_batch(batch: List[tuple[int, data_utils.SpiderExample]]) -> None:
+        db_id = batch[0][1].db_id
+        schema = dataset.get_schema(db_id)
+        prompt = prompt_template.build_batched_prompt(
+            [example.question for _, example in batch], schema
+        )
+
+        parsed = None
+        async with semaphore:
+            try:
+                if LOGGER.isEnabledFor(prompt_log_level):
+                    LOGGER.log(prompt_log_level, "Prompt sent to LLM: %s", prompt)
+                result = await client.agenerate(prompt=prompt, model=model_name)
+                parsed = prompt_template.parse_batched_response(result.sql, expected=len(batch))
+            except Exception as exc:  # pragma: no cover - network dependent
+                LOGGER.error("Failed to generate batched SQL for %s: %s", db_id, exc)
+
+        if parsed is None:
+            # Unparseable or failed batch: retry each question individually.
+            LOGGER.warning(
+                "Falling back to single prompts for %d %s examples", len(batch), db_id
+            )
+            for index, example in batch:
+                await generate_one(index, example)
+            return
+
+        for (index, _), predicted_sql in zip(batch, parsed):
+            await record(index, data_utils.extract_sql_query(predicted_sql))
+
+    try:
+        if batch_size > 1:
+            tasks = [
+                asyncio.create_task(generate_batch(batch))
+                for batch in _batch_by_db(examples, batch_size)
+            ]
+        else:
+            tasks = [
+                asyncio.create_task(generate_one(index, example))
+                for index, example in enumerate(examples)
+            ]
+        for future in tqdm.as_completed(tasks, total=len(tasks), desc="Generating SQL"):
+            await future
+            if max_failures is not None and failures > max_failures:
+                for task in tasks:
+                    task.cancel()
+                raise RuntimeError(
+                    f"Aborting run: {failures} examples failed (--max-failures={max_failures})"
+                )
+    finally:
+        if partial_fh is not None:
+            partial_fh.close()
+
+    return pred_rows
+
+
 def main() -> None:
     # Configurable parameters
     args = parse_args()
@@ -72,23 +294,33 @@ def main() -> None:
     # Log file path
     log_file = log_dir / "run.log"
     
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s:%(name)s:%(message)s",
-        filename=log_file,
-        filemode="w"   # "w" to overwrite on each run, or "a" to append
+    # Configure logging; records go through a queue so formatting and disk
+    # writes happen on a listener thread instead of blocking the event loop
+    file_handler = logging.FileHandler(
+        log_file,
+        mode="w"   # "w" to overwrite on each run, or "a" to append
+    )
+    file_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(levelname)s:%(name)s:%(message)s")
     )
 
     # Also log to console
     console = logging.StreamHandler()
     console.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
-    logging.getLogger().addHandler(console)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler, console)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(args.log_level)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
     logging.info("Logging has started")
 
     dataset = data_utils.load_dataset_from_config(args.config)
-    config = json.loads(Path(args.config).read_text())
+    config = orjson.loads(Path(args.config).read_bytes())
 
     model_name = args.model or config.get("default_model")
     if not model_name:
@@ -106,30 +338,40 @@ def main() -> None:
     predictions_path.parent.mkdir(parents=True, exist_ok=True)
 
     # Initiate the LLM through the selected router
-    client = llm.OpenAIChatLLM(router=router_name)
+    response_cache = None if args.no_cache else cache.ResponseCache(args.cache_path)
+    client = llm.OpenAIChatLLM(router=router_name, cache=response_cache)
 
-    pred_rows: List[str] = []
-    start_time = perf_counter()
-    iterator = dataset.iter_examples(limit=args.num_samples)
-    total = args.num_samples or len(dataset)
-    for example in tqdm(iterator, total=total, desc="Generating SQL"):
-        schema = dataset.get_schema(example.db_id)
-        prompt = prompt_template.build_prompt(example.question, schema, db_id=example.db_id)
-
-        try:
-            LOGGER.info("Prompt sent to LLM: %s", prompt)
-            result = client.generate(prompt=prompt, model=model_name)
-            predicted_sql = data_utils.extract_sql_query(result.sql)
-            LOGGER.info("Predicted SQL Query: %s", predicted_sql)
-        except Exception as exc:  # pragma: no cover - network dependent
-            LOGGER.error("Failed to generate SQL for %s: %s", example.db_id, exc)
-            predicted_sql = ""
-
-        # Append SQL (or empty line if model failed)
-        pred_rows.append(predicted_sql)
+    if uvloop is not None:
+        uvloop.install()
+        LOGGER.debug("Using uvloop event loop")
 
+    examples = list(dataset.iter_examples(limit=args.num_samples))
+    partial_path = predictions_path.with_suffix(".partial")
+    start_time = perf_counter()
+    pred_rows = asyncio.run(
+        generate_predictions(
+            client,
+            dataset,
+            examples,
+            model_name=model_name,
+            concurrency=args.concurrency,
+            partial_path=partial_path,
+            max_schema_tables=args.max_schema_tables or None,
+            batch_size=args.batch_size,
+            max_failures=args.max_failures,
+            log_prompts=args.log_prompts,
+        )
+    )
     elapsed = perf_counter() - start_time
-    predictions_path.write_text("\n".join(pred_rows) + "\n", encoding="utf-8")
+
+    # All tasks completed: write the ordered output and drop the crash log
+    with predictions_path.open("w", encoding="utf-8", buffering=1 << 16) as fh:
+        for row in pred_rows:
+            fh.write(row)
+            fh.write("\n")
+        fh.flush()
+        os.fsync(fh.fileno())
+    partial_path.unlink(missing_ok=True)
     LOGGER.info("Saved %d predictions to %s", len(pred_rows), predictions_path)
     avg_latency = elapsed / len(pred_rows) if pred_rows else 0.0
     LOGGER.info("Total latency: %.2f seconds (avg %.2f s/example)", elapsed, avg_latency)
@@ -0,0 +1,67 @@
+"""SQLite-backed cache for LLM prompt/response pairs."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path("cache") / "llm_cache.sqlite3"
+
+
+def cache_key(model: str, prompt: str) -> bytes:
+    """Return a stable content-addressed key for a ``(model, prompt)`` pair."""
+
+    return hashlib.blake2b(f"{model}\0{prompt}".encode("utf-8"), digest_size=16).digest()
+
+
+class ResponseCache:
+    """Content-addressed cache mapping ``(model, prompt)`` to generated SQL.
+
+    Entries are keyed by a blake2b digest of the model name and prompt, so
+    repeated prompts (parameter sweeps, retries, evaluation re-runs) resolve
+    to a local lookup instead of a network call. The store is a single
+    SQLite file opened in WAL mode so concurrent readers do not block the
+    writer.
+    """
+
+    def __init__(self, path: os.PathLike[str] | str = DEFAULT_CACHE_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        LOGGER.debug("Opening response cache at %s", self.path)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv (key BLOB PRIMARY KEY, sql TEXT, raw TEXT)"
+        )
+        self._conn.commit()
+
+    def get(self, model: str, prompt: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Return the cached ``(sql, raw)`` pair for the prompt, if present."""
+
+        row = self._conn.execute(
+            "SELECT sql, raw FROM kv WHERE key = ?", (cache_key(model, prompt),)
+        ).fetchone()
+        if row is None:
+            return None
+
+        sql, raw = row
+        return sql, json.loads(raw) if raw else {}
+
+    def put(self, model: str, prompt: str, sql: str, raw: Dict[str, Any]) -> None:
+        """Store the response for the prompt, replacing any previous entry."""
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO kv (key, sql, raw) VALUES (?, ?, ?)",
+            (cache_key(model, prompt), sql, json.dumps(raw)),
+        )
+        self._conn.commit()
+
+    def close(self) -> None:  # pragma: no cover - trivial
+        self._conn.close()
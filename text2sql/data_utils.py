@@ -1,17 +1,28 @@
 """Utility helpers for loading and working with the Spider dataset."""
 from __future__ import annotations
 
-import json
+import array
+import itertools
 import logging
 import os
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional
 
+import orjson
+
 import re
 
 LOGGER = logging.getLogger(__name__)
 
+# Precompiled patterns for extract_sql_query; compiling once at import time
+# keeps the per-example post-processing path free of pattern parsing.
+_FENCE_OPEN = re.compile(r"^```(?:sql)?\s*", re.IGNORECASE)
+_FENCE_CLOSE = re.compile(r"\s*```$")
+_PREFIX_SQL = re.compile(r"^sql\s*query:\s*", re.IGNORECASE)
+_PREFIX_THE = re.compile(r"^the\s*sql\s*(?:query|statement)\s*(?:is)?:\s*", re.IGNORECASE)
+_SELECT_WITH = re.compile(r"(SELECT|WITH)\s", re.IGNORECASE)
+
 
 @dataclass
 class SpiderExample:
@@ -54,80 +65,114 @@ class SpiderDataset:
             )
 
         LOGGER.debug("Loading Spider dev set from %s", self.dev_path)
-        self._examples: List[SpiderExample] = [
-            SpiderExample(
-                question=item["question"],
-                gold_sql=item["query"],
-                db_id=item["db_id"],
-            )
-            for item in json.loads(self.dev_path.read_text())
-        ]
-        LOGGER.debug("Loaded %d Spider examples", len(self._examples))
+        # Keep the parsed records as-is; SpiderExample instances are built
+        # on access so a --num_samples run does not pay for the full set.
+        self._raw_examples: List[dict] = orjson.loads(self.dev_path.read_bytes())
+        LOGGER.debug("Loaded %d Spider examples", len(self._raw_examples))
 
         LOGGER.debug("Loading schema metadata from %s", self.tables_path)
         self._schemas: Dict[str, dict] = {
-            item["db_id"]: item for item in json.loads(self.tables_path.read_text())
+            item["db_id"]: item for item in orjson.loads(self.tables_path.read_bytes())
+        }
+
+        # Regroup each schema's column metadata once at load time; the raw
+        # list-of-[table_idx, name] pairs is awkward to traverse per call.
+        self._tables: Dict[str, List[tuple[str, List[str]]]] = {
+            db_id: self._build_tables(schema) for db_id, schema in self._schemas.items()
+        }
+
+        # Format each schema string once; get_schema is called per example
+        # but there are only a handful of unique databases.
+        self._schema_strings: Dict[str, str] = {
+            db_id: self._format_tables(tables) for db_id, tables in self._tables.items()
         }
 
     def __len__(self) -> int:  # pragma: no cover - trivial
-        return len(self._examples)
+        return len(self._raw_examples)
 
     def __iter__(self) -> Iterable[SpiderExample]:  # pragma: no cover - trivial
-        yield from self._examples
+        yield from self.iter_examples()
 
     def get(self, index: int) -> SpiderExample:
-        return self._examples[index]
+        return self._make_example(self._raw_examples[index])
 
     def iter_examples(self, limit: Optional[int] = None) -> Iterable[SpiderExample]:
         """Iterate over Spider examples with an optional limit."""
 
-        if limit is None:
-            yield from self._examples
-            return
+        for item in itertools.islice(self._raw_examples, limit):
+            yield self._make_example(item)
 
-        for example in self._examples[:limit]:
-            yield example
+    @staticmethod
+    def _make_example(item: dict) -> SpiderExample:
+        return SpiderExample(
+            question=item["question"],
+            gold_sql=item["query"],
+            db_id=item["db_id"],
+        )
 
     # ------------------------------------------------------------------
     # Schema helpers
     # ------------------------------------------------------------------
     def get_schema(self, db_id: str) -> str:
-        """Return a human-readable schema description for ``db_id``."""
+        """Return the precomputed human-readable schema description for ``db_id``.
 
-        schema = self._schemas.get(db_id)
-        if schema is None:
-            raise KeyError(f"Unknown Spider database id: {db_id}")
+        ``db_id`` values come from the dataset itself, so this is a bare
+        dict lookup on the hot per-example path; an unknown id raises
+        ``KeyError`` naturally.
+        """
 
-        lines: List[str] = []
-        for table_name, column_names in self._iter_tables(schema):
-            friendly_columns = ", ".join(column_names)
-            lines.append(f"Table: {table_name}({friendly_columns})")
+        return self._schema_strings[db_id]
+
+    def get_tables(self, db_id: str) -> List[tuple[str, List[str]]]:
+        """Return the precomputed ``(table_name, column_names)`` pairs for ``db_id``."""
 
-        schema_str = "\n".join(lines)
-        LOGGER.debug("Schema for %s:\n%s", db_id, schema_str)
-        return schema_str
+        return self._tables[db_id]
 
     @staticmethod
-    def _iter_tables(schema: Dict[str, object]) -> Iterable[tuple[str, List[str]]]:
-        tables = schema.get("table_names_original", [])
-        columns: List[List[object]] = schema.get("column_names_original", [])
+    def _build_tables(schema: Dict[str, object]) -> List[tuple[str, List[str]]]:
+        """Regroup raw schema metadata into ``(table_name, column_names)`` pairs.
 
-        table_to_columns: Dict[int, List[str]] = {i: [] for i in range(len(tables))}
-        for table_idx, column_name in columns:
-            if table_idx == -1:
+        Columns are split into parallel index/name arrays and grouped by
+        table index in one pass, rather than dereferencing a tiny
+        ``[table_idx, name]`` list per column on every traversal.
+        """
+
+        table_names = schema.get("table_names_original", [])
+        raw_columns: List[List[object]] = schema.get("column_names_original", [])
+
+        table_idx = array.array("i", (column[0] for column in raw_columns))
+        column_names = [column[1] for column in raw_columns]
+
+        columns_by_table: Dict[int, List[str]] = {}
+        paired = zip(table_idx, column_names)
+        for idx, group in itertools.groupby(paired, key=lambda pair: pair[0]):
+            if idx == -1:
                 # Skip pseudo column for *
                 continue
-            table_to_columns.setdefault(table_idx, []).append(column_name)
+            columns_by_table.setdefault(idx, []).extend(name for _, name in group)
 
-        for idx, table_name in enumerate(tables):
-            yield table_name, table_to_columns.get(idx, [])
+        return [
+            (table_name, columns_by_table.get(idx, []))
+            for idx, table_name in enumerate(table_names)
+        ]
+
+    @staticmethod
+    def _format_tables(tables: List[tuple[str, List[str]]]) -> str:
+        """Build the ``Table: name(col, ...)`` description for one schema."""
+
+        lines: List[str] = []
+        for table_name, column_names in tables:
+            friendly_columns = ", ".join(column_names)
+            lines.append(f"Table: {table_name}({friendly_columns})")
+
+        return "\n".join(lines)
 
 
 def load_dataset_from_config(config_path: os.PathLike[str] | str) -> SpiderDataset:
     """Instantiate :class:`SpiderDataset` from a ``config.json`` file."""
 
     config_path = Path(config_path)
-    config = json.loads(config_path.read_text())
+    config = orjson.loads(config_path.read_bytes())
     spider_path = config.get("spider_path", "spider_data")
     dev_filename = config.get("dev_filename", "dev.json")
     tables_filename = config.get("tables_filename", "tables.json")
@@ -151,18 +196,26 @@ def extract_sql_query(response: str) -> str:
 
     text = response.strip()
 
-    # 1. Remove ```sql or ``` fences if they exist
-    text = re.sub(r"^```(?:sql)?\s*", "", text, flags=re.IGNORECASE)
-    text = re.sub(r"\s*```$", "", text)
-
-    # 2. Remove common prefixes like "SQL Query:" or "The SQL is:"
-    text = re.sub(r"(?i)^sql\s*query:\s*", "", text)
-    text = re.sub(r"(?i)^the\s*sql\s*(query|statement)\s*(is)?:\s*", "", text)
-
-    # 3. Sometimes LLMs return explanation + query. Extract first SELECT or WITH onwards.
-    match = re.search(r"(?i)(SELECT|WITH)\s", text)
-    if match:
-        text = text[match.start():]
+    # Fast path: a bare SELECT/WITH statement with no fence needs no regex
+    # work at all, and deepseek-style models return exactly that.
+    if "`" not in text[:8] and text[:6].upper().startswith(("SELECT", "WITH ")):
+        return text.replace("\n", " ").strip()
+
+    # Common case: the response is already bare SQL, so skip the fence and
+    # prefix substitutions entirely.
+    if not _SELECT_WITH.match(text):
+        # 1. Remove ```sql or ``` fences if they exist
+        text = _FENCE_OPEN.sub("", text)
+        text = _FENCE_CLOSE.sub("", text)
+
+        # 2. Remove common prefixes like "SQL Query:" or "The SQL is:"
+        text = _PREFIX_SQL.sub("", text)
+        text = _PREFIX_THE.sub("", text)
+
+        # 3. Sometimes LLMs return explanation + query. Extract first SELECT or WITH onwards.
+        match = _SELECT_WITH.search(text)
+        if match:
+            text = text[match.start():]
 
     # 4. Strip trailing spaces, newlines, or semicolons (keep one if needed)
     text = text.strip().replace("\n", " ")
@@ -0,0 +1,158 @@
+"""Wrapper around the official Spider evaluation script."""
+from __future__ import annotations
+
+import contextlib
+import io
+import logging
+import mmap
+import os
+import subprocess
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Optional
+
+import orjson
+
+LOGGER = logging.getLogger(__name__)
+
+# Repository root holding the official evaluation.py / process_sql.py copies.
+_REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Imported Spider evaluation module, cached so repeat evaluations (e.g. one
+# per checkpoint) pay the import cost only once.
+_SPIDER_EVAL: Optional[ModuleType] = None
+
+
+def load_config(config_path: os.PathLike[str] | str) -> dict:
+    """Load ``config.json`` describing dataset and evaluation paths."""
+
+    return orjson.loads(Path(config_path).read_bytes())
+
+
+def predictions_to_sql_file(
+    predictions_path: os.PathLike[str] | str,
+    output_path: os.PathLike[str] | str,
+) -> int:
+    """Convert a JSONL predictions file to the one-SQL-per-line format.
+
+    Each input line is a JSON record with a ``pred_sql`` field; the output
+    is the plain ``.sql`` file expected by the Spider evaluator. The input
+    is memory-mapped and scanned for newlines, so each record is parsed by
+    orjson straight from a zero-copy slice instead of being read into the
+    Python heap line by line; output is staged in a bytearray flushed in
+    ~1 MB chunks. Returns the number of records written.
+    """
+
+    predictions_path = Path(predictions_path)
+    output_path = Path(output_path)
+
+    if predictions_path.stat().st_size == 0:
+        # Empty files cannot be mapped; just truncate the output.
+        output_path.write_bytes(b"")
+        LOGGER.info("Wrote 0 predictions to %s", output_path)
+        return 0
+
+    written = 0
+    out = bytearray()
+    with predictions_path.open("rb") as src, output_path.open("wb") as dst:
+        mm = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            start = 0
+            size = len(mm)
+            while start < size:
+                newline = mm.find(b"\n", start)
+                if newline == -1:
+                    newline = size
+                line = mm[start:newline]
+                start = newline + 1
+                if not line.strip():
+                    continue
+                record = orjson.loads(line)
+                out += (record.get("pred_sql") or "").strip().encode("utf-8")
+                out += b"\n"
+                written += 1
+                if len(out) > 1 << 20:
+                    dst.write(out)
+                    out.clear()
+            if out:
+                dst.write(out)
+        finally:
+            mm.close()
+
+    LOGGER.info("Wrote %d predictions to %s", written, output_path)
+    return written
+
+
+def _spider_eval_module() -> ModuleType:
+    """Import the official ``evaluation`` module once and cache it."""
+
+    global _SPIDER_EVAL
+    if _SPIDER_EVAL is None:
+        if str(_REPO_ROOT) not in sys.path:
+            sys.path.insert(0, str(_REPO_ROOT))
+        import evaluation as spider_eval  # noqa: PLC0415 - deferred heavy import
+
+        _SPIDER_EVAL = spider_eval
+    return _SPIDER_EVAL
+
+
+def run_spider_evaluation(
+    gold_sql_path: os.PathLike[str] | str,
+    predictions_path: os.PathLike[str] | str,
+    db_dir: os.PathLike[str] | str,
+    tables_path: os.PathLike[str] | str,
+    etype: str = "all",
+) -> str:
+    """Run the official Spider evaluation and return its report as a string.
+
+    The evaluator is imported and called in-process, which avoids paying
+    interpreter startup and module imports for every invocation. If the
+    import fails (e.g. a dependency of the official script is missing from
+    this interpreter), the original subprocess path is used as a fallback.
+    """
+
+    try:
+        module = _spider_eval_module()
+    except ImportError as exc:  # pragma: no cover - environment dependent
+        LOGGER.warning("In-process Spider evaluation unavailable (%s); using subprocess", exc)
+        return _run_spider_evaluation_subprocess(
+            gold_sql_path, predictions_path, db_dir, tables_path, etype
+        )
+
+    kmaps = module.build_foreign_key_map_from_json(str(tables_path))
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        module.evaluate(str(gold_sql_path), str(predictions_path), str(db_dir), etype, kmaps)
+    return buffer.getvalue()
+
+
+def _run_spider_evaluation_subprocess(
+    gold_sql_path: os.PathLike[str] | str,
+    predictions_path: os.PathLike[str] | str,
+    db_dir: os.PathLike[str] | str,
+    tables_path: os.PathLike[str] | str,
+    etype: str = "all",
+) -> str:
+    """Fallback that shells out to ``evaluation.py`` as a separate process."""
+
+    completed = subprocess.run(
+        [
+            sys.executable,
+            str(_REPO_ROOT / "evaluation.py"),
+            "--gold",
+            str(gold_sql_path),
+            "--pred",
+            str(predictions_path),
+            "--db",
+            str(db_dir),
+            "--table",
+            str(tables_path),
+            "--etype",
+            etype,
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return completed.stdout
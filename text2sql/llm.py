@@ -1,25 +1,62 @@
 """Client wrappers for calling OpenRouter and DeepSeek models."""
 from __future__ import annotations
 
+import functools
 import logging
 import os
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
-from openai import OpenAI, OpenAIError
+import httpx
+from openai import APIConnectionError, APITimeoutError, AsyncOpenAI, OpenAI, OpenAIError, RateLimitError
 from openai.types.chat import ChatCompletion
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+from .cache import ResponseCache
 
 LOGGER = logging.getLogger(__name__)
 
+# Connection pool shared by all requests of one client; HTTP/2 lets many
+# in-flight completions multiplex over a handful of TLS connections instead
+# of paying a TCP+TLS handshake per call.
+_POOL_LIMITS = httpx.Limits(max_connections=128, max_keepalive_connections=64)
+
+# Retry transient transport/rate-limit failures with exponential backoff.
+_RETRY = retry(
+    retry=retry_if_exception_type((APIConnectionError, APITimeoutError, RateLimitError)),
+    wait=wait_exponential(multiplier=1, max=30),
+    stop=stop_after_attempt(3),
+    reraise=True,
+)
+
 
 class LLMError(RuntimeError):
     """Raised when the language model API call fails."""
 
 
-@dataclass
 class LLMResult:
-    sql: str
-    raw: Dict[str, Any]
+    """Generated SQL plus lazy access to the raw completion payload.
+
+    ``model_dump()`` walks the whole Pydantic completion tree; the main
+    pipeline only reads ``sql``, so the dict is built on first ``raw``
+    access instead of per call.
+    """
+
+    def __init__(
+        self,
+        sql: str,
+        completion: Optional[ChatCompletion] = None,
+        raw: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.sql = sql
+        self._completion = completion
+        self._raw = raw
+
+    @property
+    def raw(self) -> Dict[str, Any]:
+        if self._raw is None:
+            self._raw = self._completion.model_dump() if self._completion is not None else {}
+        return self._raw
 
 
 @dataclass
@@ -43,10 +80,51 @@ ROUTER_CONFIGS: Dict[str, RouterConfig] = {
 }
 
 
+@functools.lru_cache(maxsize=None)
+def _client_for(router: str, api_key: str, timeout: int) -> OpenAI:
+    """Return the shared sync client for ``(router, api_key, timeout)``.
+
+    Clients are cached at module level so repeated :class:`OpenAIChatLLM`
+    instantiations (e.g. via :func:`safe_generate`) re-use one httpx
+    transport and its keepalive sockets instead of re-paying TLS handshakes.
+    The underlying ``httpx.Client`` is thread-safe, so sharing it across
+    threads is fine.
+    """
+
+    router_config = ROUTER_CONFIGS[router]
+    client = OpenAI(
+        api_key=api_key,
+        base_url=router_config.base_url,
+        default_headers=router_config.default_headers,
+        http_client=httpx.Client(http2=True, limits=_POOL_LIMITS),
+    )
+    return client.with_options(timeout=timeout)
+
+
+@functools.lru_cache(maxsize=None)
+def _async_client_for(router: str, api_key: str, timeout: int) -> AsyncOpenAI:
+    """Async counterpart of :func:`_client_for` with the same pooled caching."""
+
+    router_config = ROUTER_CONFIGS[router]
+    client = AsyncOpenAI(
+        api_key=api_key,
+        base_url=router_config.base_url,
+        default_headers=router_config.default_headers,
+        http_client=httpx.AsyncClient(http2=True, limits=_POOL_LIMITS),
+    )
+    return client.with_options(timeout=timeout)
+
+
 class OpenAIChatLLM:
     """Wrapper around OpenAI compatible chat completion endpoints."""
 
-    def __init__(self, router: str, api_key: Optional[str] = None, timeout: int = 120) -> None:
+    def __init__(
+        self,
+        router: str,
+        api_key: Optional[str] = None,
+        timeout: int = 120,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
         try:
             router_config = ROUTER_CONFIGS[router]
         except KeyError as exc:  # pragma: no cover - defensive programming
@@ -62,36 +140,96 @@ class OpenAIChatLLM:
 
         LOGGER.debug("Initialising OpenAI client for router '%s'", router)
 
-        client = OpenAI(
-            api_key=resolved_api_key,
-            base_url=router_config.base_url,
-            default_headers=router_config.default_headers,
-        )
-        self.client = client.with_options(timeout=timeout)
+        self.client = _client_for(router, resolved_api_key, timeout)
+        self.async_client = _async_client_for(router, resolved_api_key, timeout)
         self.router = router
+        self.cache = cache
 
     def generate(self, prompt: str, model: str) -> LLMResult:
         """Call the configured router to generate SQL for ``prompt`` using ``model``."""
 
-        LOGGER.debug("Calling router '%s' with model %s", self.router, model)
-        LOGGER.debug("Model prompt: %s", prompt)
+        cached = self._cache_lookup(prompt, model)
+        if cached is not None:
+            return cached
+
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("Calling router '%s' with model %s", self.router, model)
+            LOGGER.debug("Model prompt: %s", prompt)
 
         try:
-            completion: ChatCompletion = self.client.chat.completions.create(
-                model=model,
-                temperature=0,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": prompt},
-                ],
-            )
+            completion = self._create_completion(prompt=prompt, model=model)
         except OpenAIError as exc:  # pragma: no cover - network dependent
             LOGGER.exception("%s request failed: %s", self.router, exc)
             raise LLMError(f"{self.router} request failed") from exc
 
         sql = self._extract_sql(completion)
-        LOGGER.debug("Received SQL: %s", sql)
-        return LLMResult(sql=sql, raw=completion.model_dump())
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("Received SQL: %s", sql)
+        result = LLMResult(sql=sql, completion=completion)
+        self._cache_store(prompt, model, result)
+        return result
+
+    async def agenerate(self, prompt: str, model: str) -> LLMResult:
+        """Async counterpart of :meth:`generate` for concurrent pipelines."""
+
+        cached = self._cache_lookup(prompt, model)
+        if cached is not None:
+            return cached
+
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("Calling router '%s' (async) with model %s", self.router, model)
+            LOGGER.debug("Model prompt: %s", prompt)
+
+        try:
+            completion = await self._acreate_completion(prompt=prompt, model=model)
+        except OpenAIError as exc:  # pragma: no cover - network dependent
+            LOGGER.exception("%s request failed: %s", self.router, exc)
+            raise LLMError(f"{self.router} request failed") from exc
+
+        sql = self._extract_sql(completion)
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("Received SQL: %s", sql)
+        result = LLMResult(sql=sql, completion=completion)
+        self._cache_store(prompt, model, result)
+        return result
+
+    @_RETRY
+    def _create_completion(self, prompt: str, model: str) -> ChatCompletion:
+        return self.client.chat.completions.create(
+            model=model,
+            temperature=0,
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant."},
+                {"role": "user", "content": prompt},
+            ],
+        )
+
+    @_RETRY
+    async def _acreate_completion(self, prompt: str, model: str) -> ChatCompletion:
+        return await self.async_client.chat.completions.create(
+            model=model,
+            temperature=0,
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant."},
+                {"role": "user", "content": prompt},
+            ],
+        )
+
+    def _cache_lookup(self, prompt: str, model: str) -> Optional[LLMResult]:
+        if self.cache is None:
+            return None
+
+        hit = self.cache.get(model, prompt)
+        if hit is None:
+            return None
+
+        sql, raw = hit
+        LOGGER.debug("Cache hit for model %s", model)
+        return LLMResult(sql=sql, raw=raw)
+
+    def _cache_store(self, prompt: str, model: str, result: LLMResult) -> None:
+        if self.cache is not None:
+            self.cache.put(model, prompt, result.sql, result.raw)
 
     @staticmethod
     def _extract_sql(completion: ChatCompletion) -> str:
@@ -1,7 +1,28 @@
 """Prompt templates for Text-to-SQL models."""
 from __future__ import annotations
 
+import functools
+import logging
+import re
 from textwrap import dedent
+from typing import List, Optional, Sequence, Tuple
+
+import tiktoken
+from rapidfuzz import fuzz
+
+LOGGER = logging.getLogger(__name__)
+
+# A table is a (table_name, column_names) pair as produced by
+# SpiderDataset.get_tables.
+Table = Tuple[str, List[str]]
+
+# Keep at most this many tables in the schema block by default; large Spider
+# databases otherwise produce multi-thousand-token prompts that inflate both
+# latency and cost.
+DEFAULT_MAX_SCHEMA_TABLES = 10
+
+# Soft budget for the full prompt; exceeding it is logged, not fatal.
+MAX_PROMPT_TOKENS = 4096
 
 
 ZERO_SHOT_TEMPLATE = dedent(
@@ -16,12 +37,156 @@ ZERO_SHOT_TEMPLATE = dedent(
 ).strip()
 
 
-def build_prompt(question: str, schema: str, db_id: str | None = None) -> str:
+BATCHED_TEMPLATE = dedent(
+    """
+    You are an expert SQL query developer.
+    Given the following database schema:
+    {schema}
+    Write a correct SQL query to answer each of these questions:
+    {questions}
+    Answer with exactly one line per question, numbered to match:
+    A1: <SQL query>
+    A2: <SQL query>
+    Only output the SQL queries.
+    """
+).strip()
+
+# Matches one "A<n>: <sql>" answer line of a batched response.
+_ANSWER_LINE = re.compile(r"^A(\d+):\s*(.+)$", re.MULTILINE)
+
+
+def _relevant_tables(question: str, tables: Sequence[Table], limit: int) -> List[Table]:
+    """Select the ``limit`` tables most relevant to ``question``.
+
+    Tables are scored by the best fuzzy partial match between the question
+    and the table or any of its column names; a table whose name appears
+    verbatim in the question is always kept. The original table order is
+    preserved in the result.
+    """
+
+    question_lower = question.lower()
+    scored: List[Tuple[float, int]] = []
+    for index, (table_name, column_names) in enumerate(tables):
+        if table_name.lower() in question_lower:
+            score = 100.0
+        else:
+            score = max(
+                fuzz.partial_ratio(question_lower, candidate.lower())
+                for candidate in [table_name, *column_names]
+            )
+        scored.append((score, index))
+
+    keep = {index for _, index in sorted(scored, reverse=True)[:limit]}
+    keep.update(index for score, index in scored if score >= 100.0)
+    return [tables[index] for index in sorted(keep)]
+
+
+def _format_tables(tables: Sequence[Table]) -> str:
+    return "\n".join(
+        f"Table: {table_name}({', '.join(column_names)})" for table_name, column_names in tables
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding_for(model: Optional[str]) -> Optional[tiktoken.Encoding]:
+    """Return the tokenizer for ``model``, or ``None`` if none can be loaded.
+
+    tiktoken fetches its BPE data over the network on first use, so in an
+    offline run (e.g. a fully cache-hit re-run) loading can fail; the token
+    budget check is purely advisory, so that failure disables it rather
+    than crashing prompt construction. The lru_cache also makes the
+    warning fire once per model instead of once per example.
+    """
+
+    if model is not None:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            pass
+        except Exception as exc:  # pragma: no cover - network dependent
+            LOGGER.warning("Token budget check disabled (tokenizer unavailable): %s", exc)
+            return None
+    try:
+        # Router model ids (openrouter/deepseek) are unknown to tiktoken; the
+        # cl100k_base vocabulary is a close enough proxy for budget checks.
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as exc:  # pragma: no cover - network dependent
+        LOGGER.warning("Token budget check disabled (tokenizer unavailable): %s", exc)
+        return None
+
+
+def build_prompt(
+    question: str,
+    schema: str,
+    db_id: str | None = None,
+    tables: Optional[Sequence[Table]] = None,
+    max_tables: Optional[int] = DEFAULT_MAX_SCHEMA_TABLES,
+    model: Optional[str] = None,
+) -> str:
     """Return the zero-shot prompt for ``question`` and ``schema``.
 
-    The ``db_id`` is included to make it easy to extend the prompt in the
-    future, but it is not currently used in the template.
+    When ``tables`` is provided and the database has more than
+    ``max_tables`` tables, the schema block is rebuilt from only the tables
+    most relevant to the question, which keeps prompts for wide databases
+    within a sane token budget. Pass ``max_tables=None`` to disable
+    truncation. The final prompt is token-counted (via ``model``'s
+    tokenizer when known) and a warning is logged if it exceeds
+    :data:`MAX_PROMPT_TOKENS`.
     """
 
-    del db_id  # db_id is unused for now, but kept for compatibility
-    return ZERO_SHOT_TEMPLATE.format(question=question.strip(), schema=schema.strip())
+    if tables is not None and max_tables is not None and len(tables) > max_tables:
+        kept = _relevant_tables(question, tables, max_tables)
+        LOGGER.info(
+            "Truncated schema for %s from %d to %d tables", db_id, len(tables), len(kept)
+        )
+        schema = _format_tables(kept)
+
+    prompt = ZERO_SHOT_TEMPLATE.format(question=question.strip(), schema=schema.strip())
+
+    encoding = _encoding_for(model)
+    if encoding is not None:
+        token_count = len(encoding.encode(prompt))
+        if token_count > MAX_PROMPT_TOKENS:
+            LOGGER.warning(
+                "Prompt for %s is %d tokens (budget %d)", db_id, token_count, MAX_PROMPT_TOKENS
+            )
+
+    return prompt
+
+
+def build_batched_prompt(questions: Sequence[str], schema: str) -> str:
+    """Return a prompt asking for SQL answers to several questions at once.
+
+    All ``questions`` must target the same database so they can share one
+    schema block, amortizing the schema and instruction tokens across the
+    batch. Answers are requested as numbered ``A<n>:`` lines which
+    :func:`parse_batched_response` maps back to question order.
+    """
+
+    numbered = "\n".join(
+        f"Q{number}: {question.strip()}" for number, question in enumerate(questions, start=1)
+    )
+    return BATCHED_TEMPLATE.format(schema=schema.strip(), questions=numbered)
+
+
+def parse_batched_response(response: str, expected: int) -> Optional[List[str]]:
+    """Split a batched response into per-question SQL strings.
+
+    Returns the answers in question order, or ``None`` when the response
+    does not contain exactly one answer for every question — callers should
+    then fall back to single-question prompts.
+    """
+
+    answers: dict[int, str] = {}
+    for match in _ANSWER_LINE.finditer(response):
+        answers[int(match.group(1))] = match.group(2).strip()
+
+    if sorted(answers) != list(range(1, expected + 1)):
+        LOGGER.debug(
+            "Batched response parse failed: expected %d answers, got %s",
+            expected,
+            sorted(answers),
+        )
+        return None
+
+    return [answers[number] for number in range(1, expected + 1)]